@@ -452,12 +452,15 @@ class Controller(object):
             else:
                 self.summaries = tf.no_op()
 
+        # Sampling runs every epoch with the same fetches and feeds, so build a
+        # Session callable once instead of re-processing them in sess.run()
+        self.sample_fn = self.sess.make_callable([self.actions, self.obs, self.priors],
+                                                 feed_list=[self.batch_size])
+
     def sample(self, n):
         """Sample batch of n expressions"""
 
-        feed_dict = {self.batch_size : n}
-
-        actions, obs, priors = self.sess.run([self.actions, self.obs, self.priors], feed_dict=feed_dict)
+        actions, obs, priors = self.sample_fn(n)
 
         return actions, obs, priors
 
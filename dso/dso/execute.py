@@ -67,3 +67,75 @@ def cython_execute(traversal, X):
         return python_execute(traversal, X)
 
 
+
+def compile_traversal(traversal):
+    """
+    Compiles a traversal into a Python function of X. Calling the returned
+    function gives the same result as python_execute(traversal, X), without
+    interpreting the traversal on every call. Constant tokens are looked up in
+    the traversal at call time, so replacing them (e.g. when optimizing
+    constants) does not require compiling again.
+
+    Parameters
+    ----------
+
+    traversal : list
+        A list of nodes representing the traversal over a Program.
+
+    Returns
+    -------
+
+    function : callable
+        Function mapping X, array-like with shape = [n_samples, n_features],
+        to the result of executing the traversal.
+    """
+
+    # Emit one assignment per node in post-order, so the generated code stays
+    # flat regardless of the depth of the expression tree
+    namespace = {"T" : traversal}
+    lines = []
+    apply_stack = [] # Entries are [node index, names of computed arguments]
+
+    for i in range(len(traversal)):
+        apply_stack.append([i, []])
+
+        while len(apply_stack[-1][1]) == traversal[apply_stack[-1][0]].arity:
+            j, args = apply_stack.pop()
+            token = traversal[j]
+
+            if token.input_var is not None:
+                lines.append("    v{} = X[:, {}]".format(j, token.input_var))
+            elif token.arity == 0:
+                lines.append("    v{} = T[{}]()".format(j, j))
+            else:
+                namespace["f{}".format(j)] = token.function
+                lines.append("    v{} = f{}({})".format(j, j, ", ".join(args)))
+            if len(apply_stack) != 0:
+                apply_stack[-1][1].append("v{}".format(j))
+            else:
+                lines.append("    return v{}".format(j))
+                exec("def execute(X):\n" + "\n".join(lines), namespace)
+                return namespace["execute"]
+
+    assert False, "Function should never get here!"
+    return None
+
+def compiled_execute(function, X):
+    """
+    Execute a function returned by compile_traversal() over input X.
+
+    Parameters
+    ----------
+
+    function : callable
+        The compiled traversal over a Program.
+    X : np.array
+        The input values to execute the traversal over.
+
+    Returns
+    -------
+
+    result : float
+        The result of executing the traversal.
+    """
+    return function(X)
@@ -2,6 +2,7 @@
 
 import array
 import warnings
+from collections import OrderedDict
 from textwrap import indent
 
 import numpy as np
@@ -10,6 +11,7 @@ from sympy import pretty
 
 from dso.functions import PlaceholderConstant
 from dso.const import make_const_optimizer
+from dso.execute import compile_traversal
 from dso.utils import cached_property
 import dso.utils as U
 
@@ -222,6 +224,9 @@ class Program(object):
     have_cython = None      # Do we have cython installed
     execute = None          # Link to execute. Either cython or python
     cyfunc = None           # Link to cyfunc lib since we do an include inline
+    compiled = False        # Whether to execute compiled traversals instead
+    compiled_cache = OrderedDict() # Compiled traversals of recently executed Programs
+    compiled_cache_size = 1000     # Maximum number of Programs in compiled_cache
 
     def __init__(self, tokens=None, on_policy=True):
         """
@@ -332,22 +337,24 @@ class Program(object):
             In a single-object Program, returns just an array. In a multi-object Program, returns a list of arrays.
         """
         if Program.n_objects > 1:
+            traversals = self.get_compiled_traversals() if Program.compiled else self.traversals
             if not Program.protected:
                 result = []
                 invalids = []
-                for trav in self.traversals:
+                for trav in traversals:
                     val, invalid, self.error_node, self.error_type = Program.execute_function(trav, X)
                     result.append(val)
                     invalids.append(invalid)
                 self.invalid = any(invalids)
             else:
-                result = [Program.execute_function(trav, X) for trav in self.traversals]
+                result = [Program.execute_function(trav, X) for trav in traversals]
             return result
         else:
+            traversal = self.get_compiled_traversals()[0] if Program.compiled else self.traversal
             if not Program.protected:
-                result, self.invalid, self.error_node, self.error_type = Program.execute_function(self.traversal, X)
+                result, self.invalid, self.error_node, self.error_type = Program.execute_function(traversal, X)
             else:
-                result = Program.execute_function(self.traversal, X)
+                result = Program.execute_function(traversal, X)
             return result
 
     def optimize(self):
@@ -403,6 +410,7 @@ class Program(object):
         """Clears the class' cache"""
 
         cls.cache = {}
+        cls.compiled_cache = OrderedDict()
 
 
     @classmethod
@@ -442,8 +450,9 @@ class Program(object):
         Program.complexity_function = lambda p : all_functions[name](p)
 
     @classmethod
-    def set_execute(cls, protected):
-        """Sets which execute method to use"""
+    def set_execute(cls, protected, compiled=False):
+        """Sets which execute method to use. If compiled, each traversal is
+        compiled into a Python function once and executed through it."""
 
         # Check if cython_execute can be imported; if not, fall back to python_execute
         try:
@@ -456,6 +465,11 @@ class Program(object):
             execute_function        = python_execute
             Program.have_cython     = False
 
+        if compiled:
+            from dso.execute import compiled_execute
+            execute_function        = compiled_execute
+        Program.compiled = compiled
+
         if protected:
             Program.protected = True
             Program.execute_function = execute_function
@@ -518,6 +532,24 @@ class Program(object):
             # Return final reward after optimizing
             return self.task.reward_function(self)
 
+    def get_compiled_traversals(self):
+        """Returns the traversal of each object compiled into a function of X.
+        Compiled functions are kept in Program.compiled_cache, which evicts the
+        least recently executed Program once it is full, rather than on the
+        Program itself, since Program.cache keeps every Program alive."""
+
+        cache = Program.compiled_cache
+        functions = cache.get(self)
+        if functions is None:
+            traversals = self.traversals if Program.n_objects > 1 else [self.traversal]
+            functions = [compile_traversal(traversal) for traversal in traversals]
+            cache[self] = functions
+            if len(cache) > Program.compiled_cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(self)
+        return functions
+
     @cached_property
     def complexity(self):
         """Evaluates and returns the complexity of the program"""
@@ -588,13 +620,15 @@ class Program(object):
         print("\tInvalid: {}".format(self.invalid))
         print("\tTraversal: {}".format(self))
 
+        # Pretty printing every object is expensive; only do it once
+        pretty_strs = self.pretty()
         if Program.n_objects == 1:
             print("\tExpression:")
-            print("{}\n".format(indent(self.pretty()[0], '\t  ')))
+            print("{}\n".format(indent(pretty_strs[0], '\t  ')))
         else:
             for i in range(Program.n_objects):
                 print("\tExpression {}:".format(i))
-                print("{}\n".format(indent(self.pretty()[i], '\t  ')))
+                print("{}\n".format(indent(pretty_strs[i], '\t  ')))
 
     def __repr__(self):
         """Prints the program's traversal"""
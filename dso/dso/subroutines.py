@@ -253,7 +253,6 @@ def get_position(actions, arities, n_objects=1):
     return positions, position_last_object_ended
 
 
-@jit(nopython=True, parallel=True)
 def get_mask(pos, depth):
     """
     Given a batch of positions where the last object ended and a depth which is the current total
@@ -280,10 +279,8 @@ def get_mask(pos, depth):
     mask : np.ndarray, shape = (N,depth), dtype=np.int32
         The binary mask with zeros where the mask should be applied and ones where it shouldn't.
     """
-    mask = np.ones((pos.shape[0], depth))
-    for i in range(len(pos)):
-        for j in range(int(pos[i])):
-            mask[i, j] = 0
+    # Single broadcast comparison instead of a per-element loop; no Numba needed
+    mask = (np.arange(depth)[None, :] >= pos[:, None]).astype(np.float64)
     return mask
 
 
@@ -621,3 +618,45 @@ def jit_check_constraint_violation_descendant_with_target_tokens(\
 
     
 
+
+
+@jit(nopython=True, parallel=True)
+def jit_positional_entropy(actions):
+    """
+    Given a batch of action sequences, computes the empirical entropy of the
+    actions at each position of the sequence.
+
+    This does the same thing as:
+
+        np.apply_along_axis(empirical_entropy, 0, actions)
+
+    but counts tokens directly instead of calling np.unique once per position.
+
+    Parameters
+    __________
+
+    actions : np.ndarray, shape=(N, L), dtype=np.int32
+        Batch of action sequences. Values correspond to library indices.
+
+    Returns
+    _______
+
+    entropy : np.ndarray, shape=(L,), dtype=np.float64
+        Empirical entropy of the actions at each position.
+    """
+    N, L = actions.shape
+    entropy = np.zeros(shape=(L,), dtype=np.float64)
+    if N <= 1:
+        return entropy
+
+    n_choices = actions.max() + 1
+    # Parallelized loop over positions
+    for c in prange(L):
+        counts = np.zeros(shape=(n_choices,), dtype=np.int64)
+        for r in range(N):
+            counts[actions[r, c]] += 1
+        for i in range(n_choices):
+            if counts[i] > 0:
+                p = counts[i] / N
+                entropy[c] -= p * np.log(p)
+    return entropy
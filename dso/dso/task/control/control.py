@@ -1,3 +1,5 @@
+import math
+
 import gym
 import numpy as np
 
@@ -36,7 +38,8 @@ class ControlTask(HierarchicalTask):
                  anchor=None, n_episodes_train=5, n_episodes_test=1000,
                  success_score=None, protected=False, env_kwargs=None,
                  fix_seeds=False, episode_seed_shift=0, reward_scale=True,
-                 multiobject=False, decision_tree_threshold_set=None):
+                 multiobject=False, decision_tree_threshold_set=None,
+                 vectorize_episodes=False):
         """
         Parameters
         ----------
@@ -94,6 +97,12 @@ class ControlTask(HierarchicalTask):
         decision_tree_threshold_set : list
             A set of constants {tj} for constructing nodes (xi < tj) in decision
             trees.
+
+        vectorize_episodes : bool
+            If True, the n_episodes_train training episodes are run in lockstep
+            on separate copies of the environment, so each Program is executed
+            once per step on the batch of observations. Evaluation episodes are
+            still run sequentially.
         """
 
         super(HierarchicalTask).__init__()
@@ -106,16 +115,28 @@ class ControlTask(HierarchicalTask):
         self.episode_seed_shift = episode_seed_shift
         self.multiobject = multiobject
         self.stochastic = not fix_seeds
+        self.vectorize_episodes = vectorize_episodes
 
         # Create the environment
         env_name = env
         if env_kwargs is None:
             env_kwargs = {}
-        self.env = gym.make(env_name, **env_kwargs)
 
-        # Note Zoo is not implemented as a package, which might make this tedious
-        if "Bullet" in env_name:
-            self.env = U.TimeFeatureWrapper(self.env)
+        def make_env():
+            env = gym.make(env_name, **env_kwargs)
+
+            # Note Zoo is not implemented as a package, which might make this tedious
+            if "Bullet" in env_name:
+                env = U.TimeFeatureWrapper(env)
+            return env
+
+        self.env = make_env()
+
+        # Create one environment per training episode for lockstep rollouts
+        if vectorize_episodes:
+            assert not multiobject, \
+                   "vectorize_episodes is not supported with multiobject=True."
+            self.train_envs = [self.env] + [make_env() for _ in range(n_episodes_train - 1)]
 
         # Determine reward scaling
         if isinstance(reward_scale, list):
@@ -198,21 +219,60 @@ class ControlTask(HierarchicalTask):
         else:
             self.action_dim = list(range(n_actions))
 
+        # With a single, learned action dimension, rollouts can work on Python
+        # scalars instead of length-1 arrays
+        self.scalar_action = not multiobject and n_actions == 1 and self.action_dim == 0
+        if self.scalar_action:
+            self.action_low = float(self.env.action_space.low[0])
+            self.action_high = float(self.env.action_space.high[0])
+
         # Define name based on environment and learned action dimension
         self.name = env_name
         if self.action_dim is not None:
             self.name += "_a{}".format(self.action_dim)
 
-    def get_action(self, p, obs):
-        """Helper function to get an action from Program p according to obs,
-        since Program.execute() requires 2D arrays but we only want 1D."""
+    def get_actions(self, p, obs, action):
+        """Helper function to get actions from Program p for a batch of
+        observations obs, shape (n, obs_dim). action holds the anchor (or zero)
+        actions, shape (n, action_dim). Symbolic actions are written into it,
+        then NaNs are replaced and infinites clipped."""
 
-        action = p.execute(np.array([obs]))[0]
-        return np.asarray(action)
+        # Replace fixed symbolic actions
+        for j, fixed_p in self.symbolic_actions.items():
+            action[:, j] = fixed_p.execute(obs)
+
+        # Replace symbolic action with current program
+        if self.action_dim is not None:
+            if self.multiobject:
+                # Each object's output drives its own action dimension
+                action[:] = np.column_stack(p.execute(obs))
+            else:
+                action[:, self.action_dim] = p.execute(obs)
+
+        # Replace NaNs and clip infinites
+        action[np.isnan(action)] = 0.0 # Replace NaNs with zero
+        action = np.clip(action,
+                         self.env.action_space.low,
+                         self.env.action_space.high)
+        return action
+
+    def get_scalar_action(self, p, obs_buf):
+        """Fast path of get_actions() for a single observation when the only
+        action dimension is learned. NaNs are replaced and infinites
+        clipped on a Python scalar instead of arrays."""
+
+        a = float(p.execute(obs_buf)[0])
+        if math.isnan(a):
+            a = 0.0 # Replace NaN with zero
+        a = min(max(a, self.action_low), self.action_high)
+        return np.array([a], dtype=np.float32)
 
     def run_episodes(self, p, n_episodes, evaluate):
         """Runs n_episodes episodes and returns each episodic reward."""
 
+        if self.vectorize_episodes and not evaluate:
+            return self.run_episodes_vectorized(p, n_episodes)
+
         # Run the episodes and return the average episodic reward
         r_episodes = np.zeros(n_episodes, dtype=np.float64) # Episodic rewards for each episode
         for i in range(n_episodes):
@@ -224,35 +284,61 @@ class ControlTask(HierarchicalTask):
                 seed = i + (self.episode_seed_shift * 100) + REWARD_SEED_SHIFT
                 self.env.seed(seed)
             obs = self.env.reset()
+            obs_buf = np.empty((1,) + obs.shape, dtype=obs.dtype) # 2D input to Program.execute(), reused each step
             done = False
             while not done:
+                obs_buf[0] = obs
 
-                # Compute anchor actions
-                if self.model is not None:
-                    action, _ = self.model.predict(obs)
+                if self.scalar_action:
+                    action = self.get_scalar_action(p, obs_buf)
                 else:
-                    action = np.zeros(self.env.action_space.shape,
-                                      dtype=np.float32)
+                    # Compute anchor actions
+                    if self.model is not None:
+                        action, _ = self.model.predict(obs)
+                    else:
+                        action = np.zeros(self.env.action_space.shape,
+                                          dtype=np.float32)
+                    action = self.get_actions(p, obs_buf, action[None])[0]
 
-                # Replace fixed symbolic actions
-                for j, fixed_p in self.symbolic_actions.items():
-                    action[j] = self.get_action(fixed_p, obs)
+                obs, r, done, _ = self.env.step(action)
+                r_episodes[i] += r
 
-                # Replace symbolic action with current program
-                if self.action_dim is not None:
-                    if self.multiobject:
-                        action = self.get_action(p, obs)
-                    else:
-                        action[self.action_dim] = self.get_action(p, obs)
+        return r_episodes
 
-                # Replace NaNs and clip infinites
-                action[np.isnan(action)] = 0.0 # Replace NaNs with zero
-                action = np.clip(action,
-                                 self.env.action_space.low,
-                                 self.env.action_space.high)
+    def run_episodes_vectorized(self, p, n_episodes):
+        """Runs n_episodes training episodes in lockstep, each on its own copy
+        of the environment, and returns each episodic reward."""
 
-                obs, r, done, _ = self.env.step(action)
+        assert n_episodes <= len(self.train_envs), \
+               "Requested {} episodes but only {} training environments exist." \
+               .format(n_episodes, len(self.train_envs))
+        envs = self.train_envs[:n_episodes]
+        r_episodes = np.zeros(n_episodes, dtype=np.float64) # Episodic rewards for each episode
+        obs = []
+        for i, env in enumerate(envs):
+            if self.fix_seeds:
+                seed = i + (self.episode_seed_shift * 100) + REWARD_SEED_SHIFT
+                env.seed(seed)
+            obs.append(env.reset())
+        obs = np.array(obs)
+
+        running = np.arange(n_episodes) # Indices of unfinished episodes
+        while len(running) > 0:
+            obs_running = obs[running]
+
+            # Compute anchor actions
+            if self.model is not None:
+                action, _ = self.model.predict(obs_running)
+            else:
+                action = np.zeros((len(running),) + self.env.action_space.shape,
+                                  dtype=np.float32)
+            action = self.get_actions(p, obs_running, action)
+
+            done = np.zeros(len(running), dtype=bool)
+            for k, i in enumerate(running):
+                obs[i], r, done[k], _ = envs[i].step(action[k])
                 r_episodes[i] += r
+            running = running[~done]
 
         return r_episodes
 
@@ -278,7 +364,7 @@ class ControlTask(HierarchicalTask):
         # Compute eval statistics
         r_avg_test = np.mean(r_episodes)
         success_rate = np.mean(r_episodes >= self.success_score)
-        success = success_rate == 1.0
+        success = bool(success_rate == 1.0)
 
         info = {
             "r_avg_test" : r_avg_test,
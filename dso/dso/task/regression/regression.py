@@ -214,7 +214,7 @@ class RegressionTask(HierarchicalTask):
             nmse_test_noiseless = np.mean((self.y_test_noiseless - y_hat) ** 2) / self.var_y_test_noiseless
 
             # Success is defined by NMSE on noiseless test data below a threshold
-            success = nmse_test_noiseless < self.threshold
+            success = bool(nmse_test_noiseless < self.threshold)
 
         info = {
             "nmse_test" : nmse_test,
@@ -226,6 +226,10 @@ def set_task(config_task):
     # Use of protected functions is the same for all tasks, so it's handled separately
     protected = config_task["protected"] if "protected" in config_task else False
 
-    Program.set_execute(protected)
+    # Compiled execution is not a Task argument, so it is not passed along
+    config_task = dict(config_task)
+    compile_execute = config_task.pop("compile_execute", False)
+
+    Program.set_execute(protected, compile_execute)
     task = make_task(**config_task)
     Program.set_task(task)
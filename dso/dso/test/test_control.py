@@ -0,0 +1,82 @@
+"""Tests for rollouts of the control task."""
+
+import pytest
+import numpy as np
+
+from dso.config import load_config
+from dso.program import Program, from_str_tokens
+from dso.test.test_core import model
+from dso.test.generate_test_data import CONFIG_TRAINING_OVERRIDE
+
+
+# Includes expressions that produce NaN (log of negatives) and infinite actions
+STR_TOKENS = ["add,x1,mul,x3,x4", "log,x1", "div,x1,sub,x2,x2"]
+
+
+@pytest.fixture
+def control_task(model):
+    config = load_config("config/config_control.json")
+    config["experiment"]["logdir"] = None # Turn off saving results
+    config["task"]["fix_seeds"] = True
+    config["task"]["vectorize_episodes"] = True
+    model.set_config(config)
+    model.config_training.update(CONFIG_TRAINING_OVERRIDE)
+    model.setup()
+    return Program.task
+
+
+@pytest.mark.parametrize("str_tokens", STR_TOKENS)
+def test_scalar_action(control_task, str_tokens):
+    """Test that the scalar action fast path matches the array path."""
+
+    task = control_task
+    task.vectorize_episodes = False
+    assert task.scalar_action
+    p = from_str_tokens(str_tokens, skip_cache=True)
+
+    r_scalar = task.run_episodes(p, task.n_episodes_train, evaluate=False)
+    task.scalar_action = False
+    r_array = task.run_episodes(p, task.n_episodes_train, evaluate=False)
+    np.testing.assert_array_equal(r_scalar, r_array)
+
+
+@pytest.mark.parametrize("str_tokens", STR_TOKENS)
+def test_vectorized_episodes(control_task, str_tokens):
+    """Test that lockstep training episodes match sequential ones."""
+
+    task = control_task
+    p = from_str_tokens(str_tokens, skip_cache=True)
+
+    r_vectorized = task.run_episodes(p, task.n_episodes_train, evaluate=False)
+    task.vectorize_episodes = False
+    r_sequential = task.run_episodes(p, task.n_episodes_train, evaluate=False)
+    np.testing.assert_array_equal(r_vectorized, r_sequential)
+
+
+def test_multiobject_actions(model):
+    """Test that each object of a multi-object Program drives its own action
+    dimension."""
+
+    config = load_config({
+        "task" : {
+            "task_type" : "control",
+            "env" : "LunarLanderContinuous-v2",
+            "action_spec" : [None, None],
+            "multiobject" : True,
+            "reward_scale" : False
+        }
+    })
+    config["experiment"]["logdir"] = None # Turn off saving results
+    model.set_config(config)
+    model.config_training.update(CONFIG_TRAINING_OVERRIDE)
+    model.setup()
+    task = Program.task
+
+    np.random.seed(0)
+    obs = np.random.uniform(-0.9, 0.9, size=(10, 8)) # Within the action bounds
+    p = from_str_tokens("x1,x2", skip_cache=True)
+    action = task.get_actions(p, obs, np.zeros((10, 2), dtype=np.float32))
+    np.testing.assert_array_equal(action, obs[:, :2].astype(np.float32))
+
+    # This is required when running sequential tests
+    Program.set_n_objects(1)
@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+
+from dso.test.test_core import model
+from dso.program import Program, from_str_tokens
+from dso.test.generate_test_data import CONFIG_TRAINING_OVERRIDE
+
+
+@pytest.mark.parametrize("protected", [False, True])
+def test_compiled_execute(model, protected):
+    """Test that compiled traversals execute the same as interpreted ones."""
+
+    model.config_training.update(CONFIG_TRAINING_OVERRIDE)
+    model.setup()
+
+    np.random.seed(0)
+    X = np.random.random((100, 1))
+
+    for str_tokens in ["x1", "sin,x1", "add,mul,x1,x1,div,cos,x1,exp,x1", "sub,x1,log,mul,x1,x1"]:
+        Program.set_execute(protected)
+        p = from_str_tokens(str_tokens, skip_cache=True)
+        expected = p.execute(X)
+
+        Program.set_execute(protected, compiled=True)
+        np.testing.assert_array_equal(p.execute(X), expected)
+
+    Program.set_execute(False)
+
+
+def test_compiled_execute_constants(model):
+    """Test that compiled traversals use constants set after compiling."""
+
+    model.config["task"]["function_set"] = ["add", "mul", "sin", "const"]
+    model.config_training.update(CONFIG_TRAINING_OVERRIDE)
+    model.setup()
+
+    np.random.seed(0)
+    X = np.random.random((100, 1))
+
+    p = from_str_tokens("add,mul,const,x1,sin,const", skip_cache=True)
+    for consts in [[2.0, 0.5], [-3.0, 1.5]]:
+        p.set_constants(consts)
+
+        Program.set_execute(False)
+        expected = p.execute(X)
+
+        Program.set_execute(False, compiled=True)
+        np.testing.assert_array_equal(p.execute(X), expected)
+
+    Program.set_execute(False)
+
+
+def test_compiled_execute_multiobject(model):
+    """Test that compiled traversals execute each object of a Program."""
+
+    model.config_training.update(CONFIG_TRAINING_OVERRIDE)
+    model.setup()
+
+    np.random.seed(0)
+    X = np.random.random((100, 1))
+
+    Program.set_n_objects(2)
+    p = from_str_tokens("cos,x1,sin,x1", skip_cache=True)
+
+    Program.set_execute(False)
+    expected = p.execute(X)
+
+    Program.set_execute(False, compiled=True)
+    np.testing.assert_array_equal(p.execute(X), expected)
+
+    Program.set_execute(False)
+    Program.set_n_objects(1)
@@ -0,0 +1,20 @@
+import pytest
+
+import numpy as np
+
+from dso.subroutines import jit_positional_entropy
+from dso.utils import empirical_entropy
+
+
+@pytest.mark.parametrize("N", [0, 1, 2, 100])
+def test_positional_entropy(N):
+    """Test that jit_positional_entropy matches empirical_entropy per position."""
+
+    np.random.seed(0)
+    L = 8
+    actions = np.random.randint(0, 5, size=(N, L)).astype(np.int32)
+    if N > 0:
+        actions[:, 0] = 3 # Single-class column
+
+    expected = np.zeros(L) if N == 0 else np.apply_along_axis(empirical_entropy, 0, actions)
+    np.testing.assert_allclose(jit_positional_entropy(actions), expected)
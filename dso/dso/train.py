@@ -8,7 +8,8 @@ import tensorflow as tf
 import numpy as np
 
 from dso.program import Program, from_tokens
-from dso.utils import empirical_entropy, get_duration, weighted_quantile
+from dso.utils import get_duration, weighted_quantile
+from dso.subroutines import jit_positional_entropy
 from dso.memory import Batch, make_queue
 from dso.variance import quantile_variance
 from dso.train_stats import StatsLogger
@@ -31,7 +32,7 @@ def work(p):
 def learn(sess, controller, pool, gp_controller, output_file,
           n_epochs=None, n_samples=2000000, batch_size=1000, complexity="token",
           const_optimizer="scipy", const_params=None, alpha=0.5,
-          epsilon=0.05, n_cores_batch=1, verbose=True, save_summary=False,
+          epsilon=0.05, n_cores_batch=1, pool_min_batch=1, verbose=True, save_summary=False,
           save_all_epoch=False, baseline="R_e",
           b_jumpstart=False, early_stopping=True, hof=100, eval_all=False,
           save_pareto_front=True, debug=0, use_memory=False, memory_capacity=1e3,
@@ -91,6 +92,12 @@ def learn(sess, controller, pool, gp_controller, output_file,
         Number of cores to spread out over the batch for constant optimization
         and evaluating reward. If -1, uses multiprocessing.cpu_count().
 
+    pool_min_batch : int, optional
+        Minimum number of Programs needing reward computation for the pool to
+        be used. Smaller workloads are computed serially, since pool overhead
+        can exceed the work itself when rewards are cheap to compute. The
+        default of 1 always uses the pool; raise it to opt in.
+
     verbose : bool, optional
         Whether to print progress.
 
@@ -230,7 +237,7 @@ def learn(sess, controller, pool, gp_controller, output_file,
     # Main training loop
     p_final = None
     r_best = -np.inf
-    prev_r_best = None
+    p_r_best = None
     ewma = None if b_jumpstart else 0.0 # EWMA portion of baseline
     n_epochs = n_epochs if n_epochs is not None else int(n_samples / batch_size)
     nevals = 0 # Total number of sampled expressions (from RL or GP)
@@ -271,15 +278,18 @@ def learn(sess, controller, pool, gp_controller, output_file,
 
         # Compute rewards in parallel
         if pool is not None:
-            # Filter programs that need reward computing
-            programs_to_optimize = list(set([p for p in programs if "r" not in p.__dict__]))          
-            pool_p_dict = { p.str : p for p in pool.map(work, programs_to_optimize) }   
-            programs = [pool_p_dict[p.str] if "r" not in p.__dict__  else p for p in programs]
-            # Make sure to update cache with new programs
-            Program.cache.update(pool_p_dict)
+            # Filter programs that need reward computing, deduplicated by their
+            # token string (the same key used to map pool results back below)
+            programs_to_optimize = list({p.str : p for p in programs if "r" not in p.__dict__}.values())
+            # Small workloads skip the pool; their rewards are computed serially below
+            if len(programs_to_optimize) >= pool_min_batch:
+                pool_p_dict = { p.str : p for p in pool.map(work, programs_to_optimize) }
+                programs = [pool_p_dict[p.str] if "r" not in p.__dict__  else p for p in programs]
+                # Make sure to update cache with new programs
+                Program.cache.update(pool_p_dict)
                     
         # Compute rewards (or retrieve cached rewards)
-        r = np.array([p.r for p in programs])
+        r = np.fromiter((p.r for p in programs), dtype=np.float64, count=len(programs))
         r_train = r
 
         # Back up programs to save them properly later
@@ -288,13 +298,14 @@ def learn(sess, controller, pool, gp_controller, output_file,
         # Need for Vanilla Policy Gradient (epsilon = null)
         p_train     = programs
 
-        l           = np.array([len(p.traversal) for p in programs])
+        l           = np.fromiter((len(p.traversal) for p in programs), dtype=np.int32, count=len(programs))
+        l_train     = l
         s           = [p.str for p in programs] # Str representations of Programs
         on_policy   = np.array([p.originally_on_policy for p in programs])
         invalid     = np.array([p.invalid for p in programs], dtype=bool)
 
         if save_positional_entropy:
-            positional_entropy[epoch] = np.apply_along_axis(empirical_entropy, 0, actions)
+            positional_entropy[epoch] = jit_positional_entropy(actions)
 
         if save_top_samples_per_batch > 0:
             # sort in descending order: larger rewards -> better solutions
@@ -325,6 +336,7 @@ def learn(sess, controller, pool, gp_controller, output_file,
         actions_full = actions
         invalid_full = invalid
         r_max = np.max(r)
+        new_r_best = p_r_best is None or r_max > r_best
         r_best = max(r_max, r_best)
 
         """
@@ -377,6 +389,7 @@ def learn(sess, controller, pool, gp_controller, output_file,
 
             keep        = r >= quantile
             l           = l[keep]
+            l_train     = l
             s           = list(compress(s, keep))
             invalid     = invalid[keep]
 
@@ -391,6 +404,7 @@ def learn(sess, controller, pool, gp_controller, output_file,
                 _p                  = list(compress(programs, keep))
                 keep[batch_size:]   = False
                 r_train             = r[keep]
+                l_train             = l_full[keep]
                 p_train             = list(compress(programs, keep))
 
                 '''
@@ -415,8 +429,13 @@ def learn(sess, controller, pool, gp_controller, output_file,
             on_policy   = on_policy[keep]
 
         # Clip bounds of rewards to prevent NaNs in gradient descent
-        r       = np.clip(r,        -1e6, 1e6)
-        r_train = np.clip(r_train,  -1e6, 1e6)
+        # r and r_train are the same array unless GP samples are withheld from
+        # the controller, in which case each needs its own pass
+        if r_train is r:
+            r_train = r = np.clip(r, -1e6, 1e6)
+        else:
+            r       = np.clip(r,        -1e6, 1e6)
+            r_train = np.clip(r_train,  -1e6, 1e6)
 
         # Compute baseline
         # NOTE: pg_loss = tf.reduce_mean((self.r - self.baseline) * neglogp, name="pg_loss")
@@ -433,9 +452,8 @@ def learn(sess, controller, pool, gp_controller, output_file,
             ewma = np.mean(r_train) - quantile if ewma is None else alpha*(np.mean(r_train) - quantile) + (1 - alpha)*ewma
             b_train = quantile + ewma
 
-        # Compute sequence lengths
-        lengths = np.array([min(len(p.traversal), controller.max_length)
-                            for p in p_train], dtype=np.int32)
+        # Compute sequence lengths, reusing the traversal lengths computed above
+        lengths = np.minimum(l_train, controller.max_length).astype(np.int32)
 
         # Create the Batch
         sampled_batch = Batch(actions=actions, obs=obs, priors=priors,
@@ -464,17 +482,12 @@ def learn(sess, controller, pool, gp_controller, output_file,
             memory_queue.push_batch(sampled_batch, programs)
 
         # Update new best expression
-        new_r_best = False
-
-        if prev_r_best is None or r_max > prev_r_best:
-            new_r_best = True
+        if new_r_best:
             p_r_best = programs[np.argmax(r)]
 
-        prev_r_best = r_best
-
         # Print new best expression
         if verbose and new_r_best:
-            print("[{}] Training epoch {}/{}, current best R: {:.4f}".format(get_duration(start_time), epoch + 1, n_epochs, prev_r_best))
+            print("[{}] Training epoch {}/{}, current best R: {:.4f}".format(get_duration(start_time), epoch + 1, n_epochs, r_best))
             print("\n\t** New best")
             p_r_best.print_stats()
 
@@ -487,14 +500,14 @@ def learn(sess, controller, pool, gp_controller, output_file,
             break
 
         if verbose and (epoch + 1) % 10 == 0:
-            print("[{}] Training epoch {}/{}, current best R: {:.4f}".format(get_duration(start_time), epoch + 1, n_epochs, prev_r_best))
+            print("[{}] Training epoch {}/{}, current best R: {:.4f}".format(get_duration(start_time), epoch + 1, n_epochs, r_best))
 
         if debug >= 2:
             print("\nParameter means after epoch {} of {}:".format(epoch + 1, n_epochs))
             print_var_means()
 
         if verbose and (epoch + 1) == n_epochs:
-            print("[{}] Ending training after epoch {}/{}, current best R: {:.4f}".format(get_duration(start_time), epoch + 1, n_epochs, prev_r_best))
+            print("[{}] Ending training after epoch {}/{}, current best R: {:.4f}".format(get_duration(start_time), epoch + 1, n_epochs, r_best))
 
         if nevals > n_samples:
             break
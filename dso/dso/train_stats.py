@@ -5,10 +5,12 @@ import tensorflow as tf
 from datetime import datetime
 import pandas as pd
 from dso.program import Program, from_tokens
-from dso.utils import is_pareto_efficient, empirical_entropy
+from dso.utils import is_pareto_efficient
+from dso.subroutines import jit_positional_entropy
 from itertools import compress
 from io import StringIO
 import shutil
+import weakref
 from collections import defaultdict
 
 #These functions are defined globally so they are pickleable and can be used by Pool.map
@@ -18,6 +20,15 @@ def hof_work(p):
 def pf_work(p):
     return [p.complexity, p.r, p.on_policy_count, p.off_policy_count, repr(p.sympy_expr), repr(p), p.evaluate]
 
+def close_open_files(open_files, summary_writer=None):
+    """Close and forget all files in a dict of open files, and close the
+    summary writer, if any, so pending events are written."""
+    for f in open_files.values():
+        f.close()
+    open_files.clear()
+    if summary_writer is not None:
+        summary_writer.close()
+
 
 class StatsLogger():
     """ Class responsible for dealing with output files of training statistics. It encapsulates all outputs to files."""
@@ -86,9 +97,15 @@ class StatsLogger():
         self.buffer_epoch_stats = StringIO()  #Buffer for epoch statistics
         self.buffer_all_programs = StringIO()  #Buffer for the statistics for all programs.
         self.buffer_token_stats = StringIO()  #Buffer for epoch statistics
+        self.open_files = {}  #Output files kept open across flushes, keyed by filename
 
         self.setup_output_files()
 
+        # Close output files and the summary writer when the logger is
+        # garbage-collected or at exit, e.g. if training raises before
+        # save_results() is reached
+        weakref.finalize(self, close_open_files, self.open_files, self.summary_writer)
+
     def setup_output_files(self):
         """
         Opens and prepares all output log files controlled by this class.
@@ -133,6 +150,8 @@ class StatsLogger():
                            "baseline",
                            "time"]
                 f.write("{}\n".format(",".join(headers)))
+            # Row format for save_stats(), matching np.savetxt's default
+            self.epoch_stats_fmt = ",".join(["%.18e"] * len(headers)) + "\n"
             if self.save_all_epoch:
                 with open(self.all_info_output_file, 'w') as f:
                     # epoch : The epoch in which this line was saved
@@ -201,18 +220,18 @@ class StatsLogger():
             r_avg_full = np.mean(r_full)
 
             l_avg_full = np.mean(l_full)
-            a_ent_full = np.mean(np.apply_along_axis(empirical_entropy, 0, actions_full))
+            a_ent_full = np.mean(jit_positional_entropy(actions_full))
             n_unique_full = len(set(s_full))
             n_novel_full = len(set(s_full).difference(s_history))
             invalid_avg_full = np.mean(invalid_full)
 
             r_avg_sub = np.mean(r)
             l_avg_sub = np.mean(l)
-            a_ent_sub = np.mean(np.apply_along_axis(empirical_entropy, 0, actions))
+            a_ent_sub = np.mean(jit_positional_entropy(actions))
             n_unique_sub = len(set(s))
             n_novel_sub = len(set(s).difference(s_history))
             invalid_avg_sub = np.mean(invalid)
-            stats = np.array([[
+            stats = (
                 r_best,
                 r_max,
                 r_avg_full,
@@ -230,8 +249,8 @@ class StatsLogger():
                 invalid_avg_sub,
                 baseline,
                 epoch_walltime
-            ]], dtype=np.float32)
-            np.savetxt(self.buffer_epoch_stats, stats, delimiter=',')
+            )
+            self.buffer_epoch_stats.write(self.epoch_stats_fmt % stats)
         if self.save_all_epoch:
             all_epoch_stats = np.array([
                               [epoch]*len(r_full),
@@ -271,6 +290,7 @@ class StatsLogger():
         n_epochs = n_epochs + 1
         # First of all, saves any pending buffer
         self.flush_buffers()
+        self.close_files()
 
         if self.save_all_epoch:
             #Kept all_r numpy file for backwards compatibility.
@@ -312,8 +332,10 @@ class StatsLogger():
             else:
                 programs = list(Program.cache.values())  # All unique Programs found during training
 
-            r = [p.r for p in programs]
-            i_hof = np.argsort(r)[-self.hof:][::-1]  # Indices of top hof Programs
+            r = np.array([p.r for p in programs])
+            # Partition out the top hof Programs first, so only those are sorted
+            i_top = np.argpartition(r, -self.hof)[-self.hof:] if len(r) > self.hof else np.arange(len(r))
+            i_hof = i_top[np.argsort(r[i_top])][::-1]  # Indices of top hof Programs
             hof = [programs[i] for i in i_hof]
 
             if pool is not None:
@@ -402,10 +424,7 @@ class StatsLogger():
         for program in programs:
             for token in program.traversal:
                 token_counter[token.name] += 1
-        stats = np.array([[
-            token_counter[token] for token in token_counter.keys()
-        ]], dtype=np.int)
-        np.savetxt(self.buffer_token_stats, stats, fmt='%i', delimiter=',')
+        self.buffer_token_stats.write(",".join(map(str, token_counter.values())) + "\n")
 
     def flush_buffers(self):
         """Write all available buffers to file."""
@@ -418,8 +437,8 @@ class StatsLogger():
         if self.save_token_count:
             self.buffer_token_stats = self.flush_buffer(
                 self.buffer_token_stats, self.token_counter_output_file)
-        if self.summary_writer:
-            self.summary_writer.flush()
+        # The summary writer is not flushed here: it flushes itself in the
+        # background (every flush_secs) and is closed by close_files()
 
     def flush_buffer(self, buffer, output_file):
         """
@@ -427,8 +446,15 @@ class StatsLogger():
         :param buffer: Buffer that will be flushed
         :param output_file: File to which the buffer will be flushed
         """
-        with open(output_file, 'a') as f:
-            buffer.seek(0)
-            shutil.copyfileobj(buffer, f, -1)
+        f = self.open_files.get(output_file)
+        if f is None:
+            f = self.open_files[output_file] = open(output_file, 'a')
+        buffer.seek(0)
+        shutil.copyfileobj(buffer, f, -1)
+        f.flush()
         # clear buffer
-        return StringIO()
\ No newline at end of file
+        return StringIO()
+
+    def close_files(self):
+        """Close all output files opened by flush_buffer and the summary writer."""
+        close_open_files(self.open_files, self.summary_writer)
\ No newline at end of file